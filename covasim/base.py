@@ -6,6 +6,7 @@ import numpy as np
 import pandas as pd
 import sciris as sc
 import datetime as dt
+import itertools
 from . import utils as cvu
 from . import misc as cvm
 from . import defaults as cvd
@@ -59,9 +60,9 @@ class ParsObj(sc.prettyobj):
             if not hasattr(self, 'pars'):
                 self.pars = pars
             if not create:
-                available_keys = list(self.pars.keys())
-                mismatches = [key for key in pars.keys() if key not in available_keys]
+                mismatches = [key for key in pars.keys() if key not in self.pars] # Check against the dict, not a list of its keys
                 if len(mismatches):
+                    available_keys = list(self.pars.keys())
                     errormsg = f'Key(s) {mismatches} not found; available keys are {available_keys}'
                     raise sc.KeyNotFoundError(errormsg)
             self.pars.update(pars)
@@ -128,6 +129,9 @@ class BaseSim(ParsObj):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs) # Initialize and set the parameters as attributes
+        self._tvec         = None # Cache for the time vector; see tvec
+        self._datevec      = None # Cache for the date vector; see datevec
+        self._datevec_key  = None # The start day and number of points used to create the date vector
         return
 
     def set_seed(self, seed=-1):
@@ -142,8 +146,8 @@ class BaseSim(ParsObj):
         '''
         # Unless no seed is supplied, reset it
         if seed != -1:
-            self['rand_seed'] = seed
-        cvu.set_seed(self['rand_seed'])
+            self.pars['rand_seed'] = seed
+        cvu.set_seed(self.pars['rand_seed'])
         return
 
     @property
@@ -158,22 +162,25 @@ class BaseSim(ParsObj):
     def npts(self):
         ''' Count the number of time points '''
         try:
-            return int(self['n_days'] + 1)
+            return int(self.pars['n_days'] + 1)
         except:
             return 0
 
     @property
     def tvec(self):
-        ''' Create a time vector '''
-        try:
-            return np.arange(self.npts)
-        except:
-            return np.array([])
+        ''' Create a time vector -- cached (read-only) since it is used repeatedly '''
+        npts = self.npts
+        tvec = getattr(self, '_tvec', None) # May not exist if loaded from an older version
+        if tvec is None or len(tvec) != npts: # Recreate if n_days has changed
+            tvec = np.arange(npts)
+            tvec.flags.writeable = False
+            self._tvec = tvec
+        return tvec
 
     @property
     def datevec(self):
         '''
-        Create a vector of dates
+        Create a vector of dates -- cached (read-only) since it is used repeatedly
 
         Returns:
             Array of `datetime` instances containing the date associated with each
@@ -181,7 +188,13 @@ class BaseSim(ParsObj):
 
         '''
         try:
-            return self['start_day'] + self.tvec * dt.timedelta(days=1)
+            datekey = (self['start_day'], self.npts)
+            if getattr(self, '_datevec_key', None) != datekey: # Recreate if start_day or n_days has changed
+                datevec = self['start_day'] + self.tvec * dt.timedelta(days=1)
+                datevec.flags.writeable = False
+                self._datevec = datevec
+                self._datevec_key = datekey
+            return self._datevec
         except:
             return np.array([])
 
@@ -239,6 +252,7 @@ class BaseSim(ParsObj):
 
         Args:
             ind (int, list, or array): the day(s) in simulation time
+            dateformat (str): the format of the returned string (default '%Y-%m-%d')
             as_date (bool): whether to return as a datetime date instead of a string
 
         Returns:
@@ -254,21 +268,21 @@ class BaseSim(ParsObj):
         # Handle inputs
         if sc.isnumber(ind): # If it's a number, convert it to a list
             ind = sc.promotetolist(ind)
-        ind.extend(args)
+        inds = np.concatenate([np.array(ind, dtype=np.int64).ravel(), np.array(args, dtype=np.int64)])
         if dateformat is None:
             dateformat = '%Y-%m-%d'
 
-        # Do the conversion
-        dates = []
-        for i in ind:
-            date_obj = self['start_day'] + dt.timedelta(days=int(i))
-            if as_date:
-                dates.append(date_obj)
-            else:
-                dates.append(date_obj.strftime(dateformat))
+        # Do the conversion -- all at once, rather than constructing a timedelta for each day
+        date_arr = np.datetime64(self['start_day']) + inds.astype('timedelta64[D]')
+        if as_date:
+            dates = date_arr.tolist() # Convert to datetime objects
+        elif dateformat == '%Y-%m-%d' and date_arr.dtype == 'datetime64[D]':
+            dates = np.datetime_as_string(date_arr).tolist() # Much faster than strftime(), but only supports ISO format
+        else:
+            dates = [d.strftime(dateformat) for d in date_arr.tolist()]
 
         # Return a string rather than a list if only one provided
-        if len(ind)==1:
+        if len(inds)==1:
             dates = dates[0]
 
         return dates
@@ -306,10 +320,12 @@ class BaseSim(ParsObj):
         resdict = {}
         resdict['t'] = self.results['t'] # Assume that there is a key for time
 
+        timeseries_keys = [] # Equivalent to self.result_keys(), but filled in the loop below to avoid a second pass
         if for_json:
-            resdict['timeseries_keys'] = self.result_keys()
+            resdict['timeseries_keys'] = timeseries_keys
         for key,res in self.results.items():
             if isinstance(res, Result):
+                timeseries_keys.append(key)
                 resdict[key] = res.values
             elif for_json:
                 if key == 'date':
@@ -389,7 +405,7 @@ class BaseSim(ParsObj):
                 pardict = self.export_pars()
                 d['parameters'] = pardict
             elif key == 'summary':
-                d['summary'] = dict(sc.dcp(self.summary))
+                d['summary'] = dict(self.summary) # Values are scalars, so a shallow copy is sufficient
             else:
                 try:
                     d[key] = sc.sanitizejson(getattr(self, key))
@@ -417,9 +433,6 @@ class BaseSim(ParsObj):
 
         '''
         resdict = self.export_results(for_json=False)
-        result_df = pd.DataFrame.from_dict(resdict)
-        result_df.index = self.tvec
-        result_df.index.name = 'Day'
 
         par_df = pd.DataFrame.from_dict(sc.flattendict(self.pars, sep='_'), orient='index', columns=['Value'])
         par_df.index.name = 'Parameter'
@@ -427,7 +440,20 @@ class BaseSim(ParsObj):
         spreadsheet = sc.Spreadsheet()
         spreadsheet.freshbytes()
         with pd.ExcelWriter(spreadsheet.bytes, engine='xlsxwriter') as writer:
-            result_df.to_excel(writer, sheet_name='Results')
+
+            # Write the results column by column, rather than creating a dataframe first
+            worksheet = writer.book.add_worksheet('Results')
+            header_format = writer.book.add_format({'bold':True, 'border':1, 'align':'center', 'valign':'top'}) # As used by pandas
+            worksheet.write_row(0, 0, ['Day'] + list(resdict.keys()), header_format)
+            worksheet.write_column(1, 0, self.tvec)
+            for c,values in enumerate(resdict.values()):
+                values = np.array(values, dtype=float)
+                cells  = values.astype(object) # Excel does not support NaN or infinity, so handle these as pandas does
+                cells[np.isnan(values)]    = None # Leave blank
+                cells[values == np.inf]    = 'inf'
+                cells[values == -np.inf]   = '-inf'
+                worksheet.write_column(1, c+1, cells)
+
             par_df.to_excel(writer, sheet_name='Parameters')
         spreadsheet.load()
 
@@ -443,10 +469,13 @@ class BaseSim(ParsObj):
         '''
         "Shrinks" the simulation by removing the people, and returns
         a copy of the "shrunken" simulation. Used to reduce the memory required
-        for saved files.
+        for saved files. Note that if in_place is False, the copy is shallow: the
+        remaining attributes (e.g. results) are shared with the original sim
+        rather than copied, so this is fast even for large sims.
 
         Args:
             skip_attrs (list): a list of attributes to skip in order to perform the shrinking; default "people"
+            in_place (bool): whether to remove the attributes from this sim, or return a new sim without them
 
         Returns:
             shrunken_sim (Sim): a Sim object with the listed attributes removed
@@ -456,7 +485,7 @@ class BaseSim(ParsObj):
         if skip_attrs is None:
             skip_attrs = ['popdict', 'people']
 
-        # Create the new object, and copy original dict, skipping the skipped attributes
+        # Create the new object, and copy references to the original attributes, skipping the skipped attributes
         if in_place:
             for attr in skip_attrs:
                 setattr(self, attr, None)
@@ -469,10 +498,13 @@ class BaseSim(ParsObj):
 
     def save(self, filename=None, keep_people=None, skip_attrs=None, **kwargs):
         '''
-        Save to disk as a gzipped pickle.
+        Save to disk as a gzipped pickle. The people are stored as arrays, which
+        pickle writes as raw buffers, so most of the time is spent on compression.
 
         Args:
             filename (str or None): the name or path of the file to save to; if None, uses stored
+            keep_people (bool or None): whether to keep the people; by default, only kept if the sim has been initialized but not finished running
+            skip_attrs (list): attributes to remove before saving; see shrink()
             kwargs: passed to makefilepath()
 
         Returns:
@@ -593,16 +625,25 @@ class BasePeople(sc.prettyobj):
 
     def __add__(self, people2):
         ''' Combine two people arrays '''
-        newpeople = sc.dcp(self)
-        for key in self.keys():
-            newpeople.set(key, np.concatenate([newpeople[key], people2[key]]), die=False) # Allow size mismatch
+        keys = self.keys()
+        n_old = len(self)
+        n_new = n_old + people2.pop_size
+
+        # Copy everything except the arrays, which are allocated once at the combined size below
+        newpeople = object.__new__(self.__class__)
+        newpeople.__dict__ = sc.dcp({k:v for k,v in self.__dict__.items() if k not in keys})
+        for key,dtype in zip(keys, self._dtypes_tuple):
+            arr = np.empty(n_new, dtype=dtype)
+            arr[:n_old] = self[key]
+            arr[n_old:] = people2[key]
+            newpeople.__dict__[key] = arr
 
         # Validate
-        newpeople.pop_size += people2.pop_size
+        newpeople.pop_size = n_new
         newpeople.validate()
 
         # Reassign UIDs so they're unique
-        newpeople.set('uid', np.arange(len(newpeople)))
+        newpeople.uid[:] = np.arange(n_new)
 
         return newpeople
 
@@ -619,10 +660,10 @@ class BasePeople(sc.prettyobj):
 
 
     def get(self, key):
-        ''' Convenience method -- key can be string or list of strings '''
+        ''' Convenience method -- key can be string or list (or tuple) of strings '''
         if isinstance(key, str):
             return self[key]
-        elif isinstance(key, list):
+        elif isinstance(key, (list, tuple)):
             arr = np.zeros((len(self), len(key)))
             for k,ky in enumerate(key):
                 arr[:,k] = self[ky]
@@ -631,22 +672,22 @@ class BasePeople(sc.prettyobj):
 
     def true(self, key):
         ''' Return indices matching the condition '''
-        return self[key].nonzero()[0]
+        return np.flatnonzero(self[key])
 
 
     def false(self, key):
-        ''' Return indices not matching the condition '''
-        return (~self[key]).nonzero()[0]
+        ''' Return indices not matching the condition -- also works for non-boolean keys, where zero is false '''
+        return np.flatnonzero(np.logical_not(self[key]))
 
 
     def defined(self, key):
         ''' Return indices of people who are not-nan '''
-        return (~np.isnan(self[key])).nonzero()[0]
+        return np.flatnonzero(~np.isnan(self[key]))
 
 
     def not_defined(self, key):
         ''' Return indices of people who are nan '''
-        return np.isnan(self[key]).nonzero()[0]
+        return np.flatnonzero(np.isnan(self[key]))
 
 
     def count(self, key):
@@ -659,12 +700,24 @@ class BasePeople(sc.prettyobj):
         return (self[key]==0).sum()
 
 
+    def count_and(self, key1, key2):
+        ''' Count the number of people who have both properties, e.g. count_and('infectious', 'symptomatic') '''
+        arr1, arr2 = self[key1], self[key2]
+        if arr1.dtype == bool and arr2.dtype == bool: # Usual case: use the fused kernel
+            return cvu.count_and(arr1, arr2)
+        else:
+            return ((arr1>0) & (arr2>0)).sum()
+
+
     def keys(self, which=None):
-        ''' Returns the name of the states '''
+        ''' Returns the name of the states as a tuple, which is created once by People and then reused '''
         if which is None:
-            return self.meta.all_states[:]
+            try:
+                return self._keys_tuple
+            except AttributeError: # E.g. a BasePeople object, or one saved before the tuple was added
+                return tuple(self.meta.all_states)
         else:
-            return getattr(self.meta, which)[:]
+            return tuple(getattr(self.meta, which))
 
 
     def layer_keys(self):
@@ -692,16 +745,18 @@ class BasePeople(sc.prettyobj):
 
         # Check that the length of each array is consistent
         expected_len = len(self)
-        for key in self.keys():
-            actual_len = len(self[key])
-            if actual_len != expected_len:
-                if die:
-                    errormsg = f'Length of key "{key}" did not match population size ({actual_len} vs. {expected_len})'
-                    raise IndexError(errormsg)
-                else:
-                    if verbose:
-                        print(f'Resizing "{key}" from {actual_len} to {expected_len}')
-                    self.resize(keys=key)
+        keys = self.keys()
+        lens = np.fromiter((len(self[key]) for key in keys), dtype=np.int64, count=len(keys))
+        for k in np.flatnonzero(lens != expected_len): # Usually empty, so only loop over mismatches
+            key = keys[k]
+            actual_len = lens[k]
+            if die:
+                errormsg = f'Length of key "{key}" did not match population size ({actual_len} vs. {expected_len})'
+                raise IndexError(errormsg)
+            else:
+                if verbose:
+                    print(f'Resizing "{key}" from {actual_len} to {expected_len}')
+                self.resize(keys=key)
         return
 
 
@@ -712,7 +767,8 @@ class BasePeople(sc.prettyobj):
         self.pop_size = pop_size
         if keys is None:
             keys = self.keys()
-        keys = sc.promotetolist(keys)
+        else:
+            keys = sc.promotetolist(keys)
         for key in keys:
             self[key].resize(pop_size, refcheck=False)
         return
@@ -725,20 +781,21 @@ class BasePeople(sc.prettyobj):
 
 
     def to_arr(self):
-        ''' Return as numpy array '''
-        arr = np.empty((len(self), len(self.keys())), dtype=cvd.default_float)
-        for k,key in enumerate(self.keys()):
+        ''' Return as numpy array -- one column per key, in Fortran (column-major) order '''
+        keys = self.keys()
+        arr = np.empty((len(keys), len(self)), dtype=cvd.default_float) # Fill by row so each copy is contiguous, then transpose
+        for k,key in enumerate(keys):
             if key == 'uid':
-                arr[:,k] = np.arange(len(self))
+                arr[k,:] = np.arange(len(self))
             else:
-                arr[:,k] = self[key]
-        return arr
+                arr[k,:] = self[key]
+        return arr.T
 
 
     def person(self, ind):
         ''' Method to create person from the people '''
         p = Person()
-        for key in self.meta.all_states:
+        for key in self.keys():
             setattr(p, key, self[key][ind])
         return p
 
@@ -760,10 +817,9 @@ class BasePeople(sc.prettyobj):
         if resize:
             self.resize(pop_size=pop_size)
 
-        # Iterate over people -- slow!
-        for p,person in enumerate(people):
-            for key in self.keys():
-                self[key][p] = getattr(person, key)
+        # Fill in each key in a single pass over people
+        for key,dtype in zip(self.keys(), self._dtypes_tuple):
+            self[key][:pop_size] = np.fromiter((getattr(person, key) for person in people), dtype=dtype, count=pop_size)
 
         return
 
@@ -831,45 +887,46 @@ class BasePeople(sc.prettyobj):
         into an edge list.
         '''
 
-        # Parse the list
+        # First pass: count the contacts in each layer
         lkeys = self.layer_keys()
-        new_contacts = Contacts(layer_keys=lkeys)
-        for lkey in lkeys:
-            new_contacts[lkey]['p1']    = [] # Person 1 of the contact pair
-            new_contacts[lkey]['p2']    = [] # Person 2 of the contact pair
-
-        try:
-            for p,cdict in enumerate(contacts):
-                for lkey,p_contacts in cdict.items():
-                    n = len(p_contacts) # Number of contacts
-                    new_contacts[lkey]['p1'].extend([p]*n) # e.g. [4, 4, 4, 4]
-                    new_contacts[lkey]['p2'].extend(p_contacts) # e.g. [243, 4538, 7,19]
-        except KeyError:
-            lkeystr = ', '.join(lkeys)
-            errormsg = f'Layer "{lkey}" could not be loaded since it was not among parameter keys "{lkeystr}". Please update manually or via sim.reset_layer_pars().'
-            raise sc.KeyNotFoundError(errormsg)
+        n_per_lkey = {lkey:0 for lkey in lkeys}
+        for cdict in contacts:
+            for lkey,p_contacts in cdict.items():
+                if lkey not in n_per_lkey:
+                    lkeystr = ', '.join(lkeys)
+                    errormsg = f'Layer "{lkey}" could not be loaded since it was not among parameter keys "{lkeystr}". Please update manually or via sim.reset_layer_pars().'
+                    raise sc.KeyNotFoundError(errormsg)
+                n_per_lkey[lkey] += len(p_contacts)
 
-        # Turn into a dataframe
+        # Second pass: fill preallocated arrays, keeping a write position per layer
+        new_contacts = Contacts(layer_keys=lkeys)
+        cursors = {}
         for lkey in lkeys:
-            new_layer = Layer()
-            for ckey,value in new_contacts[lkey].items():
-                new_layer[ckey] = np.array(value, dtype=new_layer.meta[ckey])
-            new_contacts[lkey] = new_layer
+            new_layer = new_contacts[lkey]
+            new_layer['p1'] = np.empty(n_per_lkey[lkey], dtype=new_layer.meta['p1']) # Person 1 of the contact pair
+            new_layer['p2'] = np.empty(n_per_lkey[lkey], dtype=new_layer.meta['p2']) # Person 2 of the contact pair
+            cursors[lkey] = 0
+        for p,cdict in enumerate(contacts):
+            for lkey,p_contacts in cdict.items():
+                n = len(p_contacts) # Number of contacts
+                layer = new_contacts[lkey]
+                cur = cursors[lkey]
+                layer.p1[cur:cur+n] = p # e.g. [4, 4, 4, 4]
+                layer.p2[cur:cur+n] = p_contacts # e.g. [243, 4538, 7,19]
+                cursors[lkey] = cur + n
 
         return new_contacts
 
 
     @staticmethod
     def remove_duplicates(df):
-        ''' Sort the dataframe and remove duplicates -- note, not extensively tested '''
-        p1 = df[['p1', 'p2']].values.min(1) # Reassign p1 to be the lower-valued of the two contacts
-        p2 = df[['p1', 'p2']].values.max(1) # Reassign p2 to be the higher-valued of the two contacts
-        df['p1'] = p1
-        df['p2'] = p2
-        df.sort_values(['p1', 'p2'], inplace=True) # Sort by p1, then by p2
-        df.drop_duplicates(['p1', 'p2'], inplace=True) # Remove duplicates
-        df = df[df['p1'] != df['p2']] # Remove self connections
-        df.reset_index(inplace=True, drop=True)
+        ''' Sort the dataframe and remove duplicates and self connections '''
+        p1 = np.array(df['p1'].values, dtype=cvd.default_int)
+        p2 = np.array(df['p2'].values, dtype=cvd.default_int)
+        inds, p1, p2 = cvu.unique_contacts(p1, p2) # Sort by p1, then by p2, and find unique pairs
+        df = df.iloc[inds].reset_index(drop=True)
+        df['p1'] = p1[inds]
+        df['p2'] = p2[inds]
         return df
 
 
@@ -895,15 +952,17 @@ class FlexDict(dict):
     '''
 
     def __getitem__(self, key):
-        ''' Lightweight odict -- allow indexing by number, with low performance '''
+        ''' Lightweight odict -- allow indexing by number, without building a list of keys '''
         try:
             return super().__getitem__(key)
         except KeyError as KE:
-            try: # Assume it's an integer
-                dictkey = self.keys()[key]
-                return self[dictkey]
-            except:
-                raise sc.KeyNotFoundError(KE) # Raise the original error
+            if isinstance(key, (int, np.integer)):
+                n = dict.__len__(self) # Subclasses (e.g. Contacts) may redefine len()
+                ind = key + n if key < 0 else key
+                if 0 <= ind < n:
+                    dictkey = next(itertools.islice(dict.keys(self), ind, None))
+                    return super().__getitem__(dictkey)
+            raise sc.KeyNotFoundError(KE) # Raise the original error
 
     def keys(self):
         return list(super().keys())
@@ -946,8 +1005,14 @@ class Contacts(FlexDict):
         return output
 
 
-class Layer(FlexDict):
-    ''' A tiny class holding a single layer of contacts '''
+class Layer(object):
+    '''
+    A tiny class holding a single layer of contacts. Since the keys are fixed,
+    these are stored as attributes (e.g. layer.p1) rather than in a dict, but
+    dict-style access (e.g. layer['p1']) is also supported.
+    '''
+
+    __slots__ = ['meta', 'basekey', 'p1', 'p2', 'beta']
 
     def __init__(self, **kwargs):
         self.meta = {
@@ -968,6 +1033,48 @@ class Layer(FlexDict):
         return
 
 
+    def __getitem__(self, key):
+        ''' Allow layer['p1'] as well as layer.p1; like FlexDict, also allow layer[0] '''
+        if key in self.meta:
+            return getattr(self, key)
+        else:
+            try: # Assume it's an integer
+                return getattr(self, self.keys()[key])
+            except:
+                errormsg = f'Key "{key}" not found; available keys: {", ".join(self.keys())}'
+                raise sc.KeyNotFoundError(errormsg)
+
+
+    def __setitem__(self, key, value):
+        ''' Ditto '''
+        if key in self.meta:
+            setattr(self, key, value)
+        else:
+            errormsg = f'Cannot set key "{key}"; available keys: {", ".join(self.keys())}'
+            raise sc.KeyNotFoundError(errormsg)
+        return
+
+
+    def __contains__(self, key):
+        return key in self.meta
+
+
+    def __iter__(self):
+        return iter(self.keys())
+
+
+    def keys(self):
+        return list(self.meta.keys())
+
+
+    def values(self):
+        return [getattr(self, key) for key in self.meta]
+
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.meta]
+
+
     def __len__(self):
         try:
             return len(self[self.basekey])
@@ -995,7 +1102,7 @@ class Layer(FlexDict):
 
     def to_df(self):
         ''' Convert to dataframe '''
-        df = pd.DataFrame.from_dict(self)
+        df = pd.DataFrame.from_dict(dict(self.items()))
         return df
 
 
@@ -1009,48 +1116,103 @@ class Layer(FlexDict):
 
 class TransTree(sc.prettyobj):
     '''
-    A class for holding a transmission tree. Sources and targets are both lists
-    of the same length as the population size. Sources has one entry for people who
-    have been infected, zero for those who haven't. Targets is a list of lists,
-    with the length of the list being the number of people that person infected.
+    A class for holding a transmission tree. The line list is a dict keyed by
+    the index of each person who has been infected, so nothing is stored for
+    people who haven't. Each transmission event is also stored as a pair
+    of entries in the flat infector and infectee arrays, which grow as needed;
+    use targets_of() to find the people a given person infected. The list of lists
+    of targets is only created on demand by make_targets().
 
     Args:
         pop_size (int): the number of people in the population
     '''
 
     def __init__(self, pop_size, n_days):
-        self.linelist = [None]*pop_size
-        self.targets  = [[] for p in range(len(self))] # Make a list of empty lists
-        self.detailed = None
-        self.pop_size = pop_size
-        self.n_days   = n_days
+        self.linelist  = {} # Only people who have been infected are added
+        self.targets   = None # Created by make_targets()
+        self.detailed  = None
+        self.pop_size  = pop_size
+        self.n_days    = n_days
+        self.n_events  = 0 # Number of transmission events stored in the infector and infectee arrays
+        self._infector = np.empty(0, dtype=cvd.default_int) # Preallocated buffer; use self.infector
+        self._infectee = np.empty(0, dtype=cvd.default_int) # Preallocated buffer; use self.infectee
+        self._sorted   = None # Infector and infectee arrays sorted by infector, created by targets_of()
         return
 
 
     def __len__(self):
-        '''
-        The length of the transmission tree is the length of the line list,
-        which should equal the population size (non-infected people are None
-        in the line list).
-        '''
+        ''' The length of the transmission tree is the population size, not the number of infections '''
         try:
-            return len(self.linelist)
+            return self.pop_size
         except:
             return 0
 
 
+    @property
+    def infector(self):
+        ''' The source of each transmission event '''
+        return self._infector[:self.n_events]
+
+
+    @property
+    def infectee(self):
+        ''' The target of each transmission event '''
+        return self._infectee[:self.n_events]
+
+
+    def add_targets(self, sources, targets):
+        '''
+        Store new transmission events, doubling the size of the buffers when
+        they are full so that appending is cheap on average.
+
+        Args:
+            sources (array): the indices of the people causing each infection
+            targets (array): the indices of the people infected
+        '''
+        n_old = self.n_events
+        n_new = n_old + len(sources)
+        if n_new > len(self._infector):
+            capacity = max(n_new, 2*len(self._infector))
+            for attr in ['_infector', '_infectee']:
+                arr = np.empty(capacity, dtype=cvd.default_int)
+                arr[:n_old] = getattr(self, attr)[:n_old]
+                setattr(self, attr, arr)
+        self._infector[n_old:n_new] = sources
+        self._infectee[n_old:n_new] = targets
+        self.n_events = n_new
+        self._sorted = None # Reset the sorted arrays
+        return
+
+
+    def targets_of(self, uid):
+        ''' Return the indices of the people infected by the given person '''
+        if self._sorted is None:
+            order = np.argsort(self.infector, kind='mergesort') # Stable sort, so targets stay in order of infection
+            self._sorted = (self.infector[order], self.infectee[order])
+        infector, infectee = self._sorted
+        start = np.searchsorted(infector, uid, side='left')
+        end   = np.searchsorted(infector, uid, side='right')
+        return infectee[start:end]
+
+
+    def count_targets(self):
+        ''' Count the number of people each person infected '''
+        return np.bincount(self.infector, minlength=self.pop_size)
+
+
     def make_targets(self, reset=False):
         '''
         Convert sources into targets -- same information, just grouped differently.
-        Usually done inside sim:step(), here just for completeness.
+        For efficiency, sim.step() stores transmissions in the infector and infectee
+        arrays instead, so this is here just for completeness.
         '''
         if self.targets is None or reset:
             self.targets = [[] for p in range(len(self))] # Make a list of empty lists
-            for transdict in self.linelist:
-                if transdict is not None:
-                    source = transdict['source']
-                    if source is not None: # e.g., from an importation
-                        self.targets[source].append(transdict)
+            for target in sorted(self.linelist): # Sort to add targets in order of index
+                transdict = self.linelist[target]
+                source = transdict['source']
+                if source is not None: # e.g., from an importation
+                    self.targets[source].append(transdict)
             return
 
 
@@ -1061,39 +1223,37 @@ class TransTree(sc.prettyobj):
             # Reset to look like the line list, but with more detail
             self.detailed = [None]*len(self)
 
-            for transdict in self.linelist:
-
-                if transdict is not None:
-
-                    # Pull out key quantities
-                    ddict  = sc.objdict(sc.dcp(transdict)) # For "detailed dictionary"
-                    source = ddict.source
-                    target = ddict.target
-                    ddict.s = sc.objdict() # Source
-                    ddict.t = sc.objdict() # Target
-
-                    # If the source is available (e.g. not a seed infection), loop over both it and the target
-                    if source is not None:
-                        stdict = {'s':source, 't':target}
-                    else:
-                        stdict = {'t':target}
-
-                    # Pull out each of the attributes relevant to transmission
-                    attrs = ['age', 'date_symptomatic', 'date_tested', 'date_diagnosed', 'date_quarantined', 'date_severe', 'date_critical', 'date_known_contact']
-                    for st,stind in stdict.items():
-                        for attr in attrs:
-                            ddict[st][attr] = people[attr][stind]
-                    if source is not None:
-                        for attr in attrs:
-                            if attr.startswith('date_'):
-                                is_attr = attr.replace('date_', 'is_') # Convert date to a boolean, e.g. date_diagnosed -> is_diagnosed
-                                ddict.s[is_attr] = ddict.s[attr] <= ddict['date'] # These don't make sense for people just infected (targets), only sources
-
-                        ddict.s.is_asymp   = np.isnan(people.date_symptomatic[source])
-                        ddict.s.is_presymp = ~ddict.s.is_asymp and ~ddict.s.is_symptomatic # Not asymptomatic and not currently symptomatic
-                    ddict.t['is_quarantined'] = ddict.t['date_quarantined'] <= ddict['date'] # This is the only target date that it makes sense to define since it can happen before infection
-
-                    self.detailed[target] = ddict
+            for transdict in self.linelist.values():
+
+                # Pull out key quantities
+                ddict  = sc.objdict(sc.dcp(transdict)) # For "detailed dictionary"
+                source = ddict.source
+                target = ddict.target
+                ddict.s = sc.objdict() # Source
+                ddict.t = sc.objdict() # Target
+
+                # If the source is available (e.g. not a seed infection), loop over both it and the target
+                if source is not None:
+                    stdict = {'s':source, 't':target}
+                else:
+                    stdict = {'t':target}
+
+                # Pull out each of the attributes relevant to transmission
+                attrs = ['age', 'date_symptomatic', 'date_tested', 'date_diagnosed', 'date_quarantined', 'date_severe', 'date_critical', 'date_known_contact']
+                for st,stind in stdict.items():
+                    for attr in attrs:
+                        ddict[st][attr] = people[attr][stind]
+                if source is not None:
+                    for attr in attrs:
+                        if attr.startswith('date_'):
+                            is_attr = attr.replace('date_', 'is_') # Convert date to a boolean, e.g. date_diagnosed -> is_diagnosed
+                            ddict.s[is_attr] = ddict.s[attr] <= ddict['date'] # These don't make sense for people just infected (targets), only sources
+
+                    ddict.s.is_asymp   = np.isnan(people.date_symptomatic[source])
+                    ddict.s.is_presymp = ~ddict.s.is_asymp and ~ddict.s.is_symptomatic # Not asymptomatic and not currently symptomatic
+                ddict.t['is_quarantined'] = ddict.t['date_quarantined'] <= ddict['date'] # This is the only target date that it makes sense to define since it can happen before infection
+
+                self.detailed[target] = ddict
 
         return
 
@@ -29,7 +29,7 @@ class PeopleMeta(sc.prettyobj):
 
     # Set the properties of a persocn
     person = [
-        'uid',         # Any (int or str, usually)
+        'uid',         # Int
         'age',         # Float
         'sex',         # Int
         'symp_prob',   # Float
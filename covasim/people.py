@@ -23,7 +23,7 @@ class People(cvb.BasePeople):
         # Set person properties -- mostly floats
         for key in self.meta.person:
             if key == 'uid':
-                self[key] = np.arange(self.pop_size, dtype=object)
+                self[key] = np.arange(self.pop_size, dtype=cvd.default_int)
             else:
                 self[key] = np.full(self.pop_size, np.nan, dtype=cvd.default_float)
 
@@ -38,8 +38,10 @@ class People(cvb.BasePeople):
         for key in self.meta.dates + self.meta.durs:
             self[key] = np.full(self.pop_size, np.nan, dtype=cvd.default_float)
 
-        # Store the dtypes used in a flat dict
-        self._dtypes = {key:self[key].dtype for key in self.keys()} # Assign all to float by default
+        # Store the keys and dtypes, since these are fixed from now on
+        self._keys_tuple   = tuple(self.meta.all_states) # Returned by keys()
+        self._dtypes       = {key:self[key].dtype for key in self._keys_tuple} # Used by set() to cast any supplied values
+        self._dtypes_tuple = tuple(self._dtypes.values()) # Aligned with the keys, for looping over both together
         self._lock = True # Stop further attributes from being set
 
         # Set any values, if supplied
@@ -78,7 +78,10 @@ def make_people(sim, save_pop=False, popfile=None, verbose=None, die=True, reset
 
     # Actually create the people
     sim.layer_keys = layer_keys
-    people = cvppl.People(sim.pars, **popdict) # List for storing the people
+    people_kwargs = {k:v for k,v in popdict.items() if k != 'sp_uid'} # Not a People array, see below
+    people = cvppl.People(sim.pars, **people_kwargs) # List for storing the people
+    if 'sp_uid' in popdict:
+        people.sp_uid = popdict['sp_uid'] # Original SynthPops UID of each person, since people.uid is just the index
     sim.people = people
 
     average_age = sum(popdict['age']/pop_size)
@@ -309,7 +312,8 @@ def make_synthpop(sim, directed=False):
 
     # Finalize
     popdict = {}
-    popdict['uid']      = sc.dcp(uids)
+    popdict['uid']      = np.arange(len(uids), dtype=cvd.default_int) # Use the integer UIDs, as for the contacts
+    popdict['sp_uid']   = np.array(uids, dtype=object) # Keep the SynthPops UIDs so people can be mapped back to the SynthPops population
     popdict['age']      = np.array(ages)
     popdict['sex']      = np.array(sexes)
     popdict['contacts'] = sc.dcp(contacts)
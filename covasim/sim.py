@@ -369,73 +369,77 @@ class Sim(cvb.BaseSim):
 
         # Perform initial operations
         self.rescale() # Check if we need to rescale
+        pars     = self.pars # Shorten this for later use, and avoid going through __getitem__
         people   = self.people # Shorten this for later use
         flows    = people.update_states_pre(t=t) # Update the state of everyone and count the flows
         contacts = people.update_contacts() # Compute new contacts
-        bed_max  = people.count('severe') > self['n_beds'] if self['n_beds'] else False # Check for a bed constraint
+        bed_max  = people.count('severe') > pars['n_beds'] if pars['n_beds'] else False # Check for a bed constraint
 
         # Randomly infect some people (imported infections)
-        n_imports = cvu.poisson(self['n_imports']) # Imported cases
+        n_imports = cvu.poisson(pars['n_imports']) # Imported cases
         if n_imports>0:
             imporation_inds = cvu.choose(max_n=len(people), n=n_imports)
             flows['new_infections'] += people.infect(inds=imporation_inds, bed_max=bed_max)
             for ind in imporation_inds:
-                self.people.transtree.linelist[ind] = dict(source=None, target=ind, date=self.t, layer='importation')
+                people.transtree.linelist[ind] = dict(source=None, target=ind, date=t, layer='importation')
 
         # Apply interventions
-        for intervention in self['interventions']:
+        for intervention in pars['interventions']:
             intervention.apply(self)
-        if self['interv_func'] is not None: # Apply custom intervention function
-            self['interv_func'](self)
+        if pars['interv_func'] is not None: # Apply custom intervention function
+            pars['interv_func'](self)
 
         flows = people.update_states_post(flows) # Check for state changes after interventions
 
         # Compute the probability of transmission
-        beta         = cvd.default_float(self['beta'])
-        asymp_factor = cvd.default_float(self['asymp_factor'])
-        frac_time    = cvd.default_float(self['viral_dist']['frac_time'])
-        load_ratio   = cvd.default_float(self['viral_dist']['load_ratio'])
-        high_cap     = cvd.default_float(self['viral_dist']['high_cap'])
+        beta         = cvd.default_float(pars['beta'])
+        asymp_factor = cvd.default_float(pars['asymp_factor'])
+        frac_time    = cvd.default_float(pars['viral_dist']['frac_time'])
+        load_ratio   = cvd.default_float(pars['viral_dist']['load_ratio'])
+        high_cap     = cvd.default_float(pars['viral_dist']['high_cap'])
         date_inf     = people.date_infectious
         date_rec     = people.date_recovered
         date_dead    = people.date_dead
         viral_load = cvu.compute_viral_load(t, date_inf, date_rec, date_dead, frac_time, load_ratio, high_cap)
 
+        # These are the same for every layer (and are updated in place by people.infect())
+        rel_trans   = people.rel_trans
+        rel_sus     = people.rel_sus
+        inf         = people.infectious
+        sus         = people.susceptible
+        symp        = people.symptomatic
+        diag        = people.diagnosed
+        quar        = people.quarantined
+        transtree   = people.transtree
+
         for lkey,layer in contacts.items():
-            p1 = layer['p1']
-            p2 = layer['p2']
-            betas   = layer['beta']
+            p1 = layer.p1
+            p2 = layer.p2
+            betas   = layer.beta
 
             # Compute relative transmission and susceptibility
-            rel_trans   = people.rel_trans
-            rel_sus     = people.rel_sus
-            inf         = people.infectious
-            sus         = people.susceptible
-            symp        = people.symptomatic
-            diag        = people.diagnosed
-            quar        = people.quarantined
-            iso_factor  = cvd.default_float(self['iso_factor'][lkey])
-            quar_factor = cvd.default_float(self['quar_factor'][lkey])
-            beta_layer  = cvd.default_float(self['beta_layer'][lkey])
-            rel_trans, rel_sus = cvu.compute_trans_sus(rel_trans, rel_sus, inf, sus, beta_layer, viral_load, symp, diag, quar, asymp_factor, iso_factor, quar_factor)
+            iso_factor  = cvd.default_float(pars['iso_factor'][lkey])
+            quar_factor = cvd.default_float(pars['quar_factor'][lkey])
+            beta_layer  = cvd.default_float(pars['beta_layer'][lkey])
+            layer_trans, layer_sus = cvu.compute_trans_sus(rel_trans, rel_sus, inf, sus, beta_layer, viral_load, symp, diag, quar, asymp_factor, iso_factor, quar_factor)
 
             # Calculate actual transmission
             for sources,targets in [[p1,p2], [p2,p1]]: # Loop over the contact network from p1->p2 and p2->p1
-                target_inds, edge_inds = cvu.compute_infections(beta, sources, targets, betas, rel_trans, rel_sus) # Calculate transmission!
+                target_inds, edge_inds = cvu.compute_infections(beta, sources, targets, betas, layer_trans, layer_sus) # Calculate transmission!
                 flows['new_infections'] += people.infect(inds=target_inds, bed_max=bed_max) # Actually infect people
 
                 # Store the transmission tree
                 for ind in edge_inds:
                     source = sources[ind]
                     target = targets[ind]
-                    transdict = dict(source=source, target=target, date=self.t, layer=lkey)
-                    self.people.transtree.linelist[target] = transdict
-                    self.people.transtree.targets[source].append(transdict)
+                    transdict = dict(source=source, target=target, date=t, layer=lkey)
+                    transtree.linelist[target] = transdict
+                transtree.add_targets(sources[edge_inds], targets[edge_inds])
 
         # Update counts for this time step: stocks
         for key in cvd.result_stocks.keys():
             self.results[f'n_{key}'][t] = people.count(key)
-        self.results['bed_capacity'][t] = self.results['n_severe'][t]/self['n_beds'] if self['n_beds'] else 0
+        self.results['bed_capacity'][t] = self.results['n_severe'][t]/pars['n_beds'] if pars['n_beds'] else 0
 
         # Update counts for this time step: flows
         for key,count in flows.items():
@@ -609,6 +613,7 @@ class Sim(cvb.BaseSim):
         # Alternate (traditional) method -- count from the date of infection or outcome
         elif method in ['infectious', 'outcome']:
 
+            n_targets = self.people.transtree.count_targets() # Number of people each person infected
             for t in self.tvec:
 
                 # Sources are easy -- count up the arrays
@@ -620,9 +625,8 @@ class Sim(cvb.BaseSim):
                     inds       = np.concatenate((recov_inds, dead_inds))
                 sources[t] = len(inds)
 
-                # Targets are hard -- loop over the transmission tree
-                for ind in inds:
-                    targets[t] += len(self.people.transtree.targets[ind])
+                # Targets are from the transmission tree
+                targets[t] = n_targets[inds].sum()
 
             # Populate the array -- to avoid divide-by-zero, skip indices that are 0
             inds = sc.findinds(sources>0)
@@ -661,29 +665,20 @@ class Sim(cvb.BaseSim):
             gen_time (dict): the generation time results
         '''
 
-        intervals1 = np.zeros(len(self.people))
-        intervals2 = np.zeros(len(self.people))
-        pos1 = 0
-        pos2 = 0
-        targets = self.people.transtree.targets
+        tt = self.people.transtree
+        sources = tt.infector
+        targets = tt.infectee
         date_exposed = self.people.date_exposed
         date_symptomatic = self.people.date_symptomatic
-        for p in range(len(self.people)):
-            if len(targets[p])>0:
-                for target in targets[p]:
-                    target_ind = target['target']
-                    intervals1[pos1] = date_exposed[target_ind] - date_exposed[p]
-                    pos1 += 1
-                    if not np.isnan(date_symptomatic[p]):
-                        if not np.isnan(date_symptomatic[target_ind]):
-                            intervals2[pos2] = date_symptomatic[target_ind] - date_symptomatic[p]
-                            pos2 += 1
+        intervals1 = np.array(date_exposed[targets] - date_exposed[sources], dtype=cvd.result_float)
+        both_symp = ~np.isnan(date_symptomatic[sources]) & ~np.isnan(date_symptomatic[targets]) # Only include pairs where both were symptomatic
+        intervals2 = np.array(date_symptomatic[targets[both_symp]] - date_symptomatic[sources[both_symp]], dtype=cvd.result_float)
 
         self.results['gen_time'] = {
-                'true':         np.mean(intervals1[:pos1]),
-                'true_std':     np.std(intervals1[:pos1]),
-                'clinical':     np.mean(intervals2[:pos2]),
-                'clinical_std': np.std(intervals2[:pos2])}
+                'true':         np.mean(intervals1),
+                'true_std':     np.std(intervals1),
+                'clinical':     np.mean(intervals2),
+                'clinical_std': np.std(intervals2)}
         return self.results['gen_time']
 
 
@@ -93,6 +93,47 @@ def compute_infections(beta,     sources,  targets,   layer_betas, rel_trans,  r
     return target_inds, edge_inds
 
 
+@nb.njit(            (nbint[:], nbint[:]), cache=True)
+def unique_contacts(p1,       p2):
+    '''
+    Canonicalize contact pairs so that p1 <= p2, then find the indices of the
+    unique contacts (sorted by p1, then by p2), skipping self-connections.
+
+    Args:
+        p1: (int[]) person 1 of each contact pair
+        p2: (int[]) person 2 of each contact pair
+
+    Returns:
+        inds (int[]): indices of the first occurrence of each unique pair, in sorted order
+        lo (int[]): the lower-valued person of each pair
+        hi (int[]): the higher-valued person of each pair
+    '''
+    lo   = np.minimum(p1, p2) # Reassign p1 to be the lower-valued of the two contacts
+    hi   = np.maximum(p1, p2) # Reassign p2 to be the higher-valued of the two contacts
+    keys = (lo.astype(np.int64) << 32) | hi.astype(np.int64) # Pack each pair into a single sortable key
+    order = np.argsort(keys, kind='mergesort') # Stable sort, so the first occurrence of each pair is kept
+    inds  = np.empty(len(order), dtype=np.int64)
+    count = 0
+    prev  = -1 # Keys are never negative, so this never matches
+    for i in order:
+        key = keys[i]
+        if key != prev and lo[i] != hi[i]: # Skip duplicates and self connections
+            inds[count] = i
+            count += 1
+        prev = key
+    return inds[:count], lo, hi
+
+
+@nb.njit(            (nbbool[:], nbbool[:]), cache=True) # Not parallel: Numba's thread pool deadlocks if sims are later run with multiprocessing
+def count_and(arr1,     arr2):
+    ''' Count the entries that are true in both boolean arrays, in a single pass '''
+    count = 0
+    for i in range(len(arr1)):
+        if arr1[i] and arr2[i]:
+            count += 1
+    return count
+
+
 
 #%% Sampling and seed methods
 
@@ -281,15 +322,15 @@ __all__ += ['true',   'false',   'defined',
 
 def true(arr):
     ''' Returns the indices of the values of the array that are true '''
-    return arr.nonzero()[0]
+    return np.flatnonzero(arr)
 
 def false(arr):
     ''' Returns the indices of the values of the array that are false '''
-    return (~arr).nonzero()[0]
+    return np.flatnonzero(np.logical_not(arr))
 
 def defined(arr):
     ''' Returns the indices of the values of the array that are not-nan '''
-    return (~np.isnan(arr)).nonzero()[0]
+    return np.flatnonzero(~np.isnan(arr))
 
 def itrue(arr, inds):
     ''' Returns the indices that are true in the array -- name is short for indices[true] '''
@@ -44,30 +44,21 @@ for i in range(runs):
     print('Making sim ', i, '...')
     sim1 = cv.Sim(pars=pars)
     sim1.run()
-    linelist = sim1.people.transtree.targets[0]
-    targets = np.zeros(len(linelist), dtype=np.int64)
-    for j in np.arange(len(linelist)):
-        targets[j] = linelist[j]['target']
+    targets = sim1.people.transtree.targets_of(0)
     time_temp = np.int64(np.array(sim1.people.date_exposed)[targets]) - np.int64(np.array(sim1.people.date_infectious[0]))
     dist_const = np.append(dist_const,time_temp)
     pars['rand_seed'] = i*np.random.rand()
     pars['viral_dist'] = {'frac_time':.5, 'load_ratio':4, 'high_cap':4}
     sim2 = cv.Sim(pars=pars)
     sim2.run()
-    linelist = sim2.people.transtree.targets[0]
-    targets = np.zeros(len(linelist), dtype=np.int64)
-    for j in np.arange(len(linelist)):
-        targets[j] = linelist[j]['target']
+    targets = sim2.people.transtree.targets_of(0)
     time_temp = np.int64(np.array(sim2.people.date_exposed)[targets]) - np.int64(np.array(sim2.people.date_infectious[0]))
     dist_twolevel = np.append(dist_twolevel,time_temp)
     pars['rand_seed'] = i*np.random.rand()
     pars['viral_dist'] = {'frac_time':.125, 'load_ratio':10, 'high_cap':1}
     sim3 = cv.Sim(pars=pars)
     sim3.run()
-    linelist = sim3.people.transtree.targets[0]
-    targets = np.zeros(len(linelist), dtype=np.int64)
-    for j in np.arange(len(linelist)):
-        targets[j] = linelist[j]['target']
+    targets = sim3.people.transtree.targets_of(0)
     time_temp = np.int64(np.array(sim3.people.date_exposed)[targets]) - np.int64(np.array(sim3.people.date_infectious[0]))
     dist_twolevel2 = np.append(dist_twolevel2,time_temp)
 
@@ -58,6 +58,7 @@ def test_base():
     sim.date(34)
     sim.date([34, 54])
     sim.date(34, 54, as_date=True)
+    assert sim.date(sim.tvec[34:36]) == sim.date([34, 35])
 
     # BaseSim methods
     sim.copy()
@@ -71,28 +72,45 @@ def test_base():
     # BasePeople methods
     ppl = sim.people
     ppl.get(['susceptible', 'infectious'])
-    ppl.keys(which='all_states')
+    assert ppl.keys() is ppl.keys() # Frozen at initialization
+    assert ppl.keys(which='all_states') == ppl.keys()
     ppl.index()
+    assert len(ppl.true('susceptible')) + len(ppl.false('susceptible')) == len(ppl)
+    assert ppl.count_and('infectious', 'symptomatic') == (ppl.infectious & ppl.symptomatic).sum()
     ppl.resize(pop_size=200)
     ppl.to_df()
     ppl.to_arr()
     ppl.person(50)
     people = ppl.to_people()
     ppl.from_people(people)
+    ppl.from_people(people[:100], resize=False) # Only overwrite the first people
+    assert len(ppl) == 200
+    assert (ppl.age[:100] == [person.age for person in people[:100]]).all()
     with pytest.raises(sc.KeyNotFoundError):
         ppl.make_edgelist([{'invalid_key':[0,1,2]}])
 
     # Contacts methods
     contacts = ppl.contacts
     df = contacts['a'].to_df()
-    ppl.remove_duplicates(df)
+    df = ppl.remove_duplicates(df)
+    assert (df['p1'] < df['p2']).all() # Pairs are canonicalized with self connections removed
+    assert not df.duplicated(['p1', 'p2']).any()
     with pytest.raises(sc.KeyNotFoundError):
         contacts['invalid_key']
+    assert contacts[0] is contacts[contacts.keys()[0]] # Integer indexing
+    with pytest.raises(sc.KeyNotFoundError):
+        contacts[len(contacts.keys())]
     contacts.values()
     len(contacts)
 
     # Transmission tree methods
     ppl.transtree.make_targets()
+    assert ppl.transtree.count_targets().sum() == ppl.transtree.n_events
+    assert all(len(ppl.transtree.targets_of(p)) == n for p,n in enumerate(ppl.transtree.count_targets()))
+    tt = ppl.transtree
+    sourced = {target:transdict['source'] for target,transdict in tt.linelist.items() if transdict['source'] is not None} # Stored separately from the arrays
+    assert 0 < len(sourced) <= tt.n_events # Can be fewer, if someone is infected in more than one layer on the same day
+    assert all(target in tt.targets_of(source) for target,source in sourced.items())
     ppl.make_detailed_transtree()
     ppl.transtree.plot()
     ppl.transtree.animate(animate=False)